@@ -0,0 +1,346 @@
+"""Differential check of faster engines against the legacy row-wise pipeline.
+
+Builds randomized synthetic orders, computation rows and lot movements,
+runs every registered engine on each SO and diffs the pivot tables,
+the Mold_End values and the PROD/BOSS HTML byte-for-byte against the
+legacy `build_pivot`, `generate_prod_report` and `generate_boss_report`.
+The Format=json reports and the BOSS dashboard are checked against the
+legacy per-SO markup cell by cell.
+
+Usage: python diff_harness.py [cases] [seed]
+"""
+import json
+import random
+import re
+import sys
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from main import build_job, build_pivot, export_target, qualify_lot_nums, stage_col_names
+from generate_prod_report import generate_prod_report
+from generate_boss_report import generate_boss_report
+from generate_dashboard import generate_dashboard
+from product_cache import ProductCache
+from report_script import table_script
+
+idx_cols = ['PO','dEnd', 'Prod_Code', 'Quantity', 'Lot_Num', 'Mold_start', 'Daily_Output']
+
+# An engine is a pivot builder, callable(df_export, main_move_df) returning
+# (pivot_table, updated_mold_ends), plus the PROD and BOSS renderers it uses
+legacy = {'pivot': build_pivot, 'prod': generate_prod_report, 'boss': generate_boss_report}
+
+engines = {}
+
+def register_engine(name, pivot=None, prod_report=None, boss_report=None):
+    """Register a candidate engine; any part left out falls back to the legacy one."""
+    engines[name] = {
+        'pivot': pivot or legacy['pivot'],
+        'prod': prod_report or legacy['prod'],
+        'boss': boss_report or legacy['boss'],
+    }
+
+register_engine('memo', pivot=ProductCache().build_pivot)
+
+def swap_case(rng, code):
+    return rng.choice([code.lower(), code.upper(), code.swapcase()])
+
+def make_plan(rng):
+    """Synthetic PurchaseOrder and Computation frames, as main.py has them after renaming."""
+    base = date(2024, 1, 1) + timedelta(days=rng.randint(0, 330))
+    products = [f"Pc-{i:03d}" for i in range(rng.randint(1, 6))]
+    orders = []
+    computes = []
+    for so_num in range(rng.randint(1, 4)):
+        so = f"SO{1000 + so_num}"
+        for line in range(rng.randint(1, 3)):
+            prod_code = rng.choice(products)
+            po_date = base + timedelta(days=rng.randint(0, 20))
+            delivery = po_date + timedelta(days=rng.randint(10, 60))
+            quantity = rng.choice([500, 1200, 3000, 10000])
+            orders.append({
+                'SO': so,
+                'PO_Date': po_date if rng.random() > 0.05 else pd.NaT,
+                'PO': f"PO-{so_num}{line}",
+                'Prod_Code': prod_code,
+                'Quantity': quantity,
+                'Delivery_Date': delivery,
+            })
+            if rng.random() < 0.85:
+                computes.append({
+                    'Prod_Code': swap_case(rng, prod_code) if rng.random() < 0.3 else prod_code,
+                    'Delivery_Date': delivery,
+                    'Quantity': quantity,
+                    'Days': rng.randint(1, 30),
+                    'Target_Start': po_date + timedelta(days=rng.randint(0, 5)) if rng.random() < 0.7 else pd.NaT,
+                    # Missing and zero output are both legal in the Computation sheet
+                    'Daily_Output': rng.choice([np.nan, 0, 50, 100, 333, 1000]),
+                    'Inventory': rng.choice([np.nan, 0, 100]),
+                })
+            if rng.random() < 0.3:
+                # Same product on another delivery, only reachable through fill_daily_output
+                computes.append({
+                    'Prod_Code': swap_case(rng, prod_code),
+                    'Delivery_Date': delivery + timedelta(days=7),
+                    'Quantity': quantity + 1,
+                    'Days': 1,
+                    'Target_Start': pd.NaT,
+                    'Daily_Output': rng.choice([np.nan, 200]),
+                    'Inventory': np.nan,
+                })
+    df_orders = pd.DataFrame(orders, columns=['SO', 'PO_Date', 'PO', 'Prod_Code', 'Quantity', 'Delivery_Date'])
+    df_compute = pd.DataFrame(computes, columns=['Prod_Code', 'Delivery_Date', 'Quantity', 'Days',
+                                                 'Target_Start', 'Daily_Output', 'Inventory'])
+    return df_orders, df_compute
+
+def make_movements(rng, df_job):
+    """Synthetic movements in main_move_df's long schema, with lots placed on window edges."""
+    rows = []
+    sources = ['Subcon', 'Receive', 'Count', 'QA', 'Pack', 'WHS']
+    lot_seq = 0
+    for _, job in df_job.iterrows():
+        dstart = pd.to_datetime(job['dStart'])
+        mold_end = pd.to_datetime(job['Mold_End'])
+        if pd.isnull(dstart):
+            continue
+        starts = [dstart - pd.Timedelta(days=1), dstart]
+        if pd.notnull(mold_end):
+            starts += [mold_end, mold_end + pd.Timedelta(days=1), mold_end + pd.Timedelta(days=rng.randint(2, 35))]
+        starts += [dstart + pd.Timedelta(days=rng.randint(-10, 60)) for _ in range(rng.randint(0, 4))]
+        for start in starts:
+            mold_start = start.date()
+            lot_seq += 1
+            lot_num = f"{mold_start:%y%m%d}-{lot_seq}"
+            prod_code = swap_case(rng, job['Prod_Code']) if rng.random() < 0.15 else job['Prod_Code']
+            mold_qty = rng.choice([0.5, 99.2, 250, 1000.7, job['Quantity'] / 2])
+            plants = ['PlantA', 'PlantB'] if rng.random() < 0.1 else ['PlantA']
+            for plant in plants:
+                rows.append((prod_code, lot_num, mold_start, mold_start, mold_qty, 'Mold', plant))
+                qty = mold_qty
+                day = mold_start
+                for source in sources:
+                    if rng.random() < 0.3:
+                        break
+                    day = day + timedelta(days=rng.randint(0, 5))
+                    qty = qty - rng.choice([0, 0, 1, 10.5])
+                    rows.append((prod_code, lot_num, mold_start, day, qty, source, plant))
+    main_move_df = pd.DataFrame(rows, columns=['Prod_Code', 'Lot_Num', 'Mold_start', 'Date', 'Qty', 'Source', 'Plant'])
+    if main_move_df['Plant'].nunique() > 1:
+        # As main.py does when more than one Lot workbook is loaded
+        main_move_df = qualify_lot_nums(main_move_df)
+    main_move_df['Qty'] = np.ceil(main_move_df['Qty'])
+    return main_move_df
+
+def run_engine(engine, df_export, main_move_df, so_value):
+    try:
+        pivot_table, mold_ends = engine['pivot'](df_export.copy(), main_move_df)
+        html_prod = engine['prod'](pivot_table, idx_cols, stage_col_names, reject_col="Rejects", so_value=so_value)
+        html_boss = engine['boss'](pivot_table, so_value=so_value)
+    except Exception as e:
+        return {'error': type(e).__name__}
+    return {'pivot': pivot_table, 'mold_ends': mold_ends, 'prod': html_prod, 'boss': html_boss}
+
+def same_mold_ends(left, right):
+    if left.keys() != right.keys():
+        return False
+    for key, val in left.items():
+        other = right[key]
+        if pd.isnull(val) or pd.isnull(other):
+            if not (pd.isnull(val) and pd.isnull(other)):
+                return False
+        elif val != other:
+            return False
+    return True
+
+def compare(reference, result):
+    """Return a description of the first difference, or None."""
+    if 'error' in reference or 'error' in result:
+        if reference.get('error') != result.get('error'):
+            return f"error {reference.get('error')} != {result.get('error')}"
+        return None
+    try:
+        pd.testing.assert_frame_equal(reference['pivot'], result['pivot'], check_exact=True)
+    except AssertionError as e:
+        return f"pivot differs: {e}"
+    if not same_mold_ends(reference['mold_ends'], result['mold_ends']):
+        return "Mold_End differs"
+    if reference['prod'].encode() != result['prod'].encode():
+        return "PROD HTML differs"
+    if reference['boss'].encode() != result['boss'].encode():
+        return "BOSS HTML differs"
+    return None
+
+def check_plant_lots(pivot_table, main_move_df):
+    """Each pivot row must be one plant's lot, with that lot's own Mold quantity."""
+    moves = main_move_df.set_index(['Prod_Code', 'Lot_Num']).sort_index()
+    for (prod_code, lot_num), mold in zip(
+        zip(pivot_table.index.get_level_values('Prod_Code'), pivot_table.index.get_level_values('Lot_Num')),
+        pivot_table['Mold']
+    ):
+        lot_moves = moves.loc[[(prod_code, lot_num)]]
+        if lot_moves['Plant'].nunique() != 1:
+            return f"lot {lot_num} of {prod_code} merges plants {', '.join(sorted(lot_moves['Plant'].unique()))}"
+        lot_mold = lot_moves[lot_moves['Source'] == 'Mold']['Qty']
+        if len(lot_mold) == 1 and mold != lot_mold.iloc[0]:
+            return f"lot {lot_num} of {prod_code} has Mold {mold}, expected {lot_mold.iloc[0]}"
+    return None
+
+payload_re = re.compile(r'<script type="application/json" data-report-table="[^"]+">(.*?)</script>', re.S)
+
+def expand_payload(payload):
+    """Python mirror of report_script.table_script: the <tr> markup the browser builds."""
+    data = payload['data']
+    classes = payload['classes']
+    bold = payload.get('bold', [])
+    merge = payload.get('merge', 0)
+    totals = payload.get('totals')
+    cols = len(data)
+    n = len(data[-1]) if cols else 0
+    spans = payload['spans'] if merge else [1] * n
+
+    def td(c, val, attrs=''):
+        cls = f' class="{classes[c]}"' if classes[c] else ''
+        return f'<td{cls}{attrs}>{val}</td>'
+
+    rows = []
+    start = 0
+    for unit, span in enumerate(spans):
+        for r in range(start, start + span):
+            cells = []
+            for c in range(cols):
+                if c < merge and r != start:
+                    continue
+                val = data[c][unit] if c < merge else data[c][r]
+                val = f'<b>{val}</b>' if c in bold else val
+                cells.append(td(c, val, f' rowspan="{span}"' if c < merge else ''))
+            rows.append('<tr>' + ''.join(cells) + '</tr>')
+        if totals:
+            cells = [f'<td class="merge-group" colspan="{merge}">Total</td>']
+            for c in range(merge, cols):
+                cells.append(td(c, sum(data[c][start:start + span])) if c in totals else '<td></td>')
+            rows.append('<tr style="background-color:#222;color:yellow;font-weight:bold;vertical-align:top;">' + ''.join(cells) + '</tr>')
+        start += span
+    return rows
+
+def compare_compact(html, compact_html):
+    """Diff a compact report against the legacy markup, cell by cell."""
+    head, rest = html.split('<tbody>', 1)
+    tbody, tail = rest.split('</tbody>', 1)
+    match = payload_re.search(compact_html)
+    if match is None:
+        return "no JSON payload"
+    page = payload_re.sub('', compact_html).replace(table_script, '')
+    if page != head + '<tbody></tbody>' + tail:
+        return "page outside the table body differs"
+    legacy_rows = re.findall(r'<tr[^>]*>.*?</tr>', tbody, re.S)
+    compact_rows = expand_payload(json.loads(match.group(1)))
+    if len(legacy_rows) != len(compact_rows):
+        return f"{len(compact_rows)} rows, expected {len(legacy_rows)}"
+    for i, (legacy_row, compact_row) in enumerate(zip(legacy_rows, compact_rows)):
+        if legacy_row == compact_row:
+            continue
+        legacy_cells = re.findall(r'<td[^>]*>.*?</td>', legacy_row, re.S)
+        compact_cells = re.findall(r'<td[^>]*>.*?</td>', compact_row, re.S)
+        for j, (legacy_cell, compact_cell) in enumerate(zip(legacy_cells, compact_cells)):
+            if legacy_cell != compact_cell:
+                return f"row {i} cell {j}: {compact_cell} != {legacy_cell}"
+        return f"row {i}: {compact_row} != {legacy_row}"
+    return None
+
+def check_compact(pivot_table, so_value):
+    """Format=json must rebuild the same cells, rowspans and Total rows as the html format."""
+    renders = {
+        'PROD': lambda compact: generate_prod_report(pivot_table, idx_cols, stage_col_names, reject_col="Rejects",
+                                                     so_value=so_value, compact=compact),
+        'BOSS': lambda compact: generate_boss_report(pivot_table, so_value=so_value, compact=compact),
+    }
+    for name, render in renders.items():
+        outputs = []
+        for compact in (False, True):
+            try:
+                outputs.append(render(compact))
+            except Exception as e:
+                outputs.append(e)
+        html, compact_html = outputs
+        if isinstance(html, Exception) or isinstance(compact_html, Exception):
+            if type(html) is not type(compact_html):
+                return f"{name} compact: error {type(html).__name__} != {type(compact_html).__name__}"
+            continue
+        diff = compare_compact(html, compact_html)
+        if diff is not None:
+            return f"{name} compact: {diff}"
+    return None
+
+def table_rows(html, table_id):
+    """Cell contents of each body row of table `table_id`."""
+    table = re.search(rf'<table id="{table_id}"[^>]*>.*?<tbody>(.*?)</tbody>', html, re.S).group(1)
+    return [re.findall(r'<td[^>]*>(.*?)</td>', row, re.S) for row in re.findall(r'<tr[^>]*>(.*?)</tr>', table, re.S)]
+
+def check_dashboard(boss_pages):
+    """Each SO's dashboard lines must show the same cells as its own BOSS report.
+
+    `boss_pages` maps each SO, in processing order, to (pivot_table, legacy BOSS html).
+    """
+    all_pivots = pd.concat(
+        [pivot_table.reset_index().assign(SO=so) for so, (pivot_table, _) in boss_pages.items()],
+        ignore_index=True
+    )
+    try:
+        dashboard = generate_dashboard(all_pivots)
+    except Exception as e:
+        return f"dashboard: error {type(e).__name__}"
+    dashboard_rows = {}
+    for cells in table_rows(dashboard, 'dashboard_lines'):
+        dashboard_rows.setdefault(cells[0], []).append(cells[1:])
+    for so, (_, html_boss) in boss_pages.items():
+        boss_rows = table_rows(html_boss, 'boss_report_table')
+        rows = dashboard_rows.get(str(so), [])
+        if len(rows) != len(boss_rows):
+            return f"dashboard SO={so}: {len(rows)} lines, expected {len(boss_rows)}"
+        for i, (row, boss_row) in enumerate(zip(rows, boss_rows)):
+            if row != boss_row:
+                return f"dashboard SO={so} line {i}: {row} != {boss_row}"
+    return None
+
+def run_case(seed):
+    rng = random.Random(seed)
+    df_orders, df_compute = make_plan(rng)
+    df_job = build_job(df_orders, df_compute)
+    main_move_df = make_movements(rng, df_job)
+
+    failures = []
+    boss_pages = {}
+    for target in list(df_job['SO'].unique()) + ['SO-MISSING']:
+        try:
+            df_export = export_target(df_job, target)
+        except Exception:
+            continue
+        reference = run_engine(legacy, df_export, main_move_df, target)
+        if 'error' not in reference:
+            diff = check_plant_lots(reference['pivot'], main_move_df)
+            if diff is not None:
+                failures.append(f"seed={seed} SO={target} lot identity: {diff}")
+            diff = check_compact(reference['pivot'], target)
+            if diff is not None:
+                failures.append(f"seed={seed} SO={target} {diff}")
+            boss_pages[target] = (reference['pivot'], reference['boss'])
+        for name, engine in engines.items():
+            diff = compare(reference, run_engine(engine, df_export, main_move_df, target))
+            if diff is not None:
+                failures.append(f"seed={seed} SO={target} engine={name}: {diff}")
+    # SOs whose legacy BOSS report fails (e.g. a line without a Mold_end) have nothing to compare against
+    if boss_pages:
+        diff = check_dashboard(boss_pages)
+        if diff is not None:
+            failures.append(f"seed={seed} {diff}")
+    return failures
+
+if __name__ == "__main__":
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    first_seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    failures = []
+    for seed in range(first_seed, first_seed + cases):
+        failures.extend(run_case(seed))
+    for failure in failures:
+        print(failure)
+    print(f"{cases} cases, engines: {', '.join(engines)}, {len(failures)} mismatches")
+    sys.exit(1 if failures else 0)
@@ -1,7 +1,30 @@
 import pandas as pd
 import numpy as np
+from report_script import embed_table, table_script
 
-def generate_boss_report(pivot_table, so_value=None):
+# (grouped column, td class, formatted as a number) for each body cell, in header order
+boss_cells = [
+    ('PO', 'col-po blue-bg bold-cell', False),
+    ('Prod_Code', 'col-prodcode blue-bg bold-cell', False),
+    ('Quantity', 'col-qty blue-bg bold-cell', True),
+    ('Mold_start_fmt', 'col-moldstart target-bg process-width', False),
+    ('Mold', 'col-mold process-width', True),
+    ('Mold_end', 'col-molddate target-bg process-width', False),
+    ('Subcon', 'col-subcon process-width', True),
+    ('Subcon_target', 'col-subcondate target-bg process-width', False),
+    ('Receive', 'col-receive process-width', True),
+    ('Receive_target', 'col-receivedate target-bg process-width', False),
+    ('Count', 'col-count process-width', True),
+    ('Count_target', 'col-countdate target-bg process-width', False),
+    ('QA', 'col-qa process-width', True),
+    ('QC_target', 'col-qadate target-bg process-width', False),
+    ('Pack', 'col-pack process-width', True),
+    ('Pack_target', 'col-packdate target-bg process-width', False),
+    ('WHS', 'col-whs process-width', True),
+    ('Rejects', 'col-rejects rejects-col', True),
+]
+
+def generate_boss_report(pivot_table, so_value=None, compact=False):
     group_cols = ['PO', 'Prod_Code', 'Quantity']
     sum_cols = ['Mold', 'Subcon', 'Receive', 'Count', 'QA', 'Pack', 'WHS', 'Rejects']
 
@@ -141,28 +164,41 @@ def generate_boss_report(pivot_table, so_value=None):
         except Exception:
             return "0"
 
-    for _, row in grouped.iterrows():
-        html.append('<tr>')
-        html.append(f'<td class="col-po blue-bg bold-cell">{row["PO"]}</td>')
-        html.append(f'<td class="col-prodcode blue-bg bold-cell">{row["Prod_Code"]}</td>')
-        html.append(f'<td class="col-qty blue-bg bold-cell">{format_num(row["Quantity"])}</td>')
-        html.append(f'<td class="col-moldstart target-bg process-width">{row["Mold_start_fmt"]}</td>')
-        html.append(f'<td class="col-mold process-width">{format_num(row["Mold"])}</td>')
-        html.append(f'<td class="col-molddate target-bg process-width">{row["Mold_end"]}</td>')
-        html.append(f'<td class="col-subcon process-width">{format_num(row["Subcon"])}</td>')
-        html.append(f'<td class="col-subcondate target-bg process-width">{row["Subcon_target"]}</td>')
-        html.append(f'<td class="col-receive process-width">{format_num(row["Receive"])}</td>')
-        html.append(f'<td class="col-receivedate target-bg process-width">{row["Receive_target"]}</td>')
-        html.append(f'<td class="col-count process-width">{format_num(row["Count"])}</td>')
-        html.append(f'<td class="col-countdate target-bg process-width">{row["Count_target"]}</td>')
-        html.append(f'<td class="col-qa process-width">{format_num(row["QA"])}</td>')
-        html.append(f'<td class="col-qadate target-bg process-width">{row["QC_target"]}</td>')
-        html.append(f'<td class="col-pack process-width">{format_num(row["Pack"])}</td>')
-        html.append(f'<td class="col-packdate target-bg process-width">{row["Pack_target"]}</td>')
-        html.append(f'<td class="col-whs process-width">{format_num(row["WHS"])}</td>')
-        html.append(f'<td class="col-rejects rejects-col">{format_num(row["Rejects"])}</td>')
-        html.append('</tr>')
-    html.append('</tbody></table>')
+    if compact:
+        # Rows are rendered in the browser from the embedded JSON
+        payload = {
+            'data': [
+                [format_num(val) if numeric else str(val) for val in grouped[col]]
+                for col, _, numeric in boss_cells
+            ],
+            'classes': [cls for _, cls, _ in boss_cells],
+        }
+        html.append('</tbody></table>')
+        html.append(embed_table('boss_report_table', payload))
+        html.append(table_script)
+    else:
+        for _, row in grouped.iterrows():
+            html.append('<tr>')
+            html.append(f'<td class="col-po blue-bg bold-cell">{row["PO"]}</td>')
+            html.append(f'<td class="col-prodcode blue-bg bold-cell">{row["Prod_Code"]}</td>')
+            html.append(f'<td class="col-qty blue-bg bold-cell">{format_num(row["Quantity"])}</td>')
+            html.append(f'<td class="col-moldstart target-bg process-width">{row["Mold_start_fmt"]}</td>')
+            html.append(f'<td class="col-mold process-width">{format_num(row["Mold"])}</td>')
+            html.append(f'<td class="col-molddate target-bg process-width">{row["Mold_end"]}</td>')
+            html.append(f'<td class="col-subcon process-width">{format_num(row["Subcon"])}</td>')
+            html.append(f'<td class="col-subcondate target-bg process-width">{row["Subcon_target"]}</td>')
+            html.append(f'<td class="col-receive process-width">{format_num(row["Receive"])}</td>')
+            html.append(f'<td class="col-receivedate target-bg process-width">{row["Receive_target"]}</td>')
+            html.append(f'<td class="col-count process-width">{format_num(row["Count"])}</td>')
+            html.append(f'<td class="col-countdate target-bg process-width">{row["Count_target"]}</td>')
+            html.append(f'<td class="col-qa process-width">{format_num(row["QA"])}</td>')
+            html.append(f'<td class="col-qadate target-bg process-width">{row["QC_target"]}</td>')
+            html.append(f'<td class="col-pack process-width">{format_num(row["Pack"])}</td>')
+            html.append(f'<td class="col-packdate target-bg process-width">{row["Pack_target"]}</td>')
+            html.append(f'<td class="col-whs process-width">{format_num(row["WHS"])}</td>')
+            html.append(f'<td class="col-rejects rejects-col">{format_num(row["Rejects"])}</td>')
+            html.append('</tr>')
+        html.append('</tbody></table>')
 
     style = """
     <style>
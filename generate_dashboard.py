@@ -0,0 +1,184 @@
+import pandas as pd
+import numpy as np
+from stage_pivot import stage_col_names
+
+stage_sum_cols = stage_col_names + ['Rejects']
+
+# Stage target offsets in days, chained from Mold End as in generate_boss_report
+target_offsets = [('Subcon_target', 2), ('Receive_target', 14), ('Count_target', 3), ('QC_target', 3), ('Pack_target', 3)]
+
+def format_md(series):
+    series = pd.to_datetime(series, errors='coerce')
+    text = series.dt.month.fillna(0).astype(int).astype(str) + '/' + series.dt.day.fillna(0).astype(int).astype(str)
+    return text.where(series.notna(), "")
+
+def format_num(series):
+    return series.fillna(0).astype(int).map(lambda val: f"{val:,}")
+
+def dashboard_frames(all_pivots):
+    """Per-line and per-SO frames from the concatenated pivot rows of every SO.
+
+    `all_pivots` is each SO's pivot_table.reset_index() with an SO column,
+    concatenated in processing order. Each SO's lines come out in the row
+    order of its generate_boss_report table.
+    """
+    group_cols = ['SO', 'PO', 'Prod_Code', 'Quantity']
+    lines = (
+        all_pivots
+        .groupby(group_cols, sort=False)
+        .agg(**{col: (col, 'sum') for col in stage_sum_cols},
+             Mold_start=('Mold_start', 'min'),
+             Daily_Output=('Daily_Output', 'first'))
+        .reset_index()
+    )
+    # SOs stay in processing order; lines within an SO follow generate_boss_report's sorted groupby
+    so_order = {so: i for i, so in enumerate(lines['SO'].unique())}
+    lines = (
+        lines
+        .assign(SO_order=lines['SO'].map(so_order))
+        .sort_values(['SO_order', 'PO', 'Prod_Code', 'Quantity'], kind='mergesort')
+        .drop(columns='SO_order')
+        .reset_index(drop=True)
+    )
+
+    # Mold_end = Mold_start + ceil(Quantity / Daily_Output), blank when it cannot be computed
+    start = pd.to_datetime(lines['Mold_start'], errors='coerce')
+    daily_output = lines['Daily_Output'].where(lines['Daily_Output'] != 0)
+    days = np.ceil(lines['Quantity'] / daily_output)
+    lines['Mold_end'] = start + pd.to_timedelta(days, unit='D')
+    previous = 'Mold_end'
+    for col, offset in target_offsets:
+        lines[col] = lines[previous] + pd.Timedelta(days=offset)
+        previous = col
+
+    summary = (
+        lines
+        .groupby('SO', sort=False)
+        .agg(Lines=('Prod_Code', 'size'),
+             Quantity=('Quantity', 'sum'),
+             **{col: (col, 'sum') for col in stage_sum_cols},
+             Mold_end=('Mold_end', 'max'),
+             Pack_target=('Pack_target', 'max'))
+        .reset_index()
+    )
+    return lines, summary
+
+def generate_dashboard(all_pivots):
+    lines, summary = dashboard_frames(all_pivots)
+
+    html = []
+    html.append(
+        f'<div style="text-align:center;margin-bottom:2px;background:#163D66;padding:10px 0;">'
+        f'<span style="color:#fff;font-weight:bold;font-size:1.3em;">BOSS Dashboard: {len(summary)} SO</span>'
+        f'</div>'
+    )
+
+    # Per-SO summary
+    summary_cols = [
+        ('SO', 'blue-bg', summary['SO'].astype(str)),
+        ('Lines', 'blue-bg', summary['Lines'].astype(str)),
+        ('Quantity', 'blue-bg', format_num(summary['Quantity'])),
+    ]
+    summary_cols += [(col, 'rejects-col' if col == 'Rejects' else '', format_num(summary[col])) for col in stage_sum_cols]
+    summary_cols += [
+        ('Mold End', 'target-bg', format_md(summary['Mold_end'])),
+        ('Pack Target', 'target-bg', format_md(summary['Pack_target'])),
+    ]
+    html.append(render_table('dashboard_summary', summary_cols, len(summary)))
+
+    # One row per (SO, PO, Prod_Code)
+    line_cols = [
+        ('SO', 'blue-bg', lines['SO'].astype(str)),
+        ('PO', 'blue-bg', lines['PO'].astype(str)),
+        ('Product Code', 'blue-bg', lines['Prod_Code'].astype(str)),
+        ('Quantity', 'blue-bg', format_num(lines['Quantity'])),
+        ('Mold Start', 'target-bg', format_md(lines['Mold_start'])),
+        ('Mold', '', format_num(lines['Mold'])),
+        ('Mold End', 'target-bg', format_md(lines['Mold_end'])),
+        ('Subcon', '', format_num(lines['Subcon'])),
+        ('Subcon Target', 'target-bg', format_md(lines['Subcon_target'])),
+        ('Receive', '', format_num(lines['Receive'])),
+        ('Receive Target', 'target-bg', format_md(lines['Receive_target'])),
+        ('Count', '', format_num(lines['Count'])),
+        ('Count Target', 'target-bg', format_md(lines['Count_target'])),
+        ('QA', '', format_num(lines['QA'])),
+        ('QA Target', 'target-bg', format_md(lines['QC_target'])),
+        ('Pack', '', format_num(lines['Pack'])),
+        ('Pack Target', 'target-bg', format_md(lines['Pack_target'])),
+        ('WHS', '', format_num(lines['WHS'])),
+        ('Rejects', 'rejects-col', format_num(lines['Rejects'])),
+    ]
+    html.append(render_table('dashboard_lines', line_cols, len(lines)))
+
+    style = """
+    <style>
+    body {
+        font-family: sans-serif;
+        margin: 0;
+        padding: 0;
+        font-size: 0.85em;
+    }
+    table {
+        width: 95vw;
+        table-layout: fixed;
+        border-collapse: collapse;
+        margin: 0 auto 20px auto;
+        box-shadow: 3px 3px 7px rgba(0, 0, 0, 0.2);
+        border: 2px solid #2c3e50;
+    }
+    th, td {
+        border: 1.5px solid #34495e;
+        padding: 6px;
+        text-align: center;
+        vertical-align: top;
+        word-break: break-word;
+        white-space: normal;
+        overflow-wrap: break-word;
+    }
+    th {
+        background-color: #3498db;
+        color: yellow;
+        font-size: 0.85em;
+    }
+    thead {
+        position: sticky;
+        top: 0;
+        z-index: 1;
+    }
+    .blue-bg {
+        background: #b4d1ed;
+        color: #222;
+        font-weight: bold;
+    }
+    .target-bg {
+        background: #cfcfcf;
+        color: #222;
+    }
+    .rejects-col {
+        background-color: #ffeaea;
+        color: #c00;
+        font-weight: bold;
+    }
+    tr:hover td:not(.blue-bg):not(.target-bg):not(.rejects-col) {
+        background-color: #333;
+        color: white;
+    }
+    </style>
+    """
+    return f"<html><head>{style}</head><body>{''.join(html)}</body></html>"
+
+def render_table(table_id, cols, n_rows):
+    """`cols` holds (header, td class, formatted values) for each column."""
+    html = [f'<table id="{table_id}" class="report-table"><thead><tr>']
+    for header, _, _ in cols:
+        html.append(f'<th>{header}</th>')
+    html.append('</tr></thead><tbody>')
+    values = [list(col_values) for _, _, col_values in cols]
+    classes = [f' class="{cls}"' if cls else '' for _, cls, _ in cols]
+    for i in range(n_rows):
+        html.append('<tr>')
+        for cls, col_values in zip(classes, values):
+            html.append(f'<td{cls}>{col_values[i]}</td>')
+        html.append('</tr>')
+    html.append('</tbody></table>')
+    return ''.join(html)
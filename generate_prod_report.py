@@ -1,6 +1,42 @@
 import pandas as pd
+from report_script import embed_table, table_script
 
-def generate_prod_report(pivot_table, idx_cols, sum_cols, reject_col="Rejects", so_value=None):
+def compact_payload(df, columns, sum_cols, reject_col):
+    """Columnar table data for the client-side renderer in report_script.
+
+    The four rowspan columns hold one value per group rather than per row.
+    """
+    merge_cols = ['PO', 'dEnd', 'Prod_Code', 'Quantity']
+    first_rows = df['_group_row'] == 0
+    data = []
+    classes = []
+    for col in columns:
+        if col in merge_cols:
+            data.append([str(val) for val in df.loc[first_rows, col]])
+        elif col in sum_cols or col == reject_col:
+            data.append([int(val) if pd.notnull(val) else 0 for val in df[col]])
+        else:
+            data.append([str(val) for val in df[col]])
+        if col in merge_cols:
+            classes.append('merge-group' + (' date-col' if col == 'dEnd' else '') + (' prod-code' if col == 'Prod_Code' else ''))
+        elif col == 'Mold_start':
+            classes.append('date-col')
+        elif col == reject_col:
+            classes.append('rejects-col')
+        else:
+            classes.append('')
+    spans = [int(val) for val in df.loc[first_rows, '_group_rowspan']]
+    totals = [i for i, col in enumerate(columns) if col in sum_cols or col == reject_col]
+    return {
+        'data': data,
+        'classes': classes,
+        'bold': [columns.index('Prod_Code')],
+        'merge': 4,
+        'spans': spans,
+        'totals': totals,
+    }
+
+def generate_prod_report(pivot_table, idx_cols, sum_cols, reject_col="Rejects", so_value=None, compact=False):
     df = pivot_table.reset_index()
     # Drop SO column if it exists in index columns and dataframe
     if 'SO' in df.columns:
@@ -35,46 +71,52 @@ def generate_prod_report(pivot_table, idx_cols, sum_cols, reject_col="Rejects",
             html.append(f'<th>{col}</th>')
     html.append('</tr></thead><tbody>')
 
-    for idx, row in df.iterrows():
-        html.append('<tr>')
-        # PO, dEnd, Prod_Code, Quantity: only render at first of group
-        for col in ['PO', 'dEnd', 'Prod_Code', 'Quantity']:
-            if row['_group_row'] == 0:
-                rowspan = int(row['_group_rowspan'])
-                cell_value = row[col]
-                if col == 'Prod_Code':
-                    cell_value = f"<b>{cell_value}</b>"
-                style_extra = ' date-col' if col == 'dEnd' else ''
-                html.append(f'<td class="merge-group{style_extra}{ " prod-code" if col=="Prod_Code" else "" }" rowspan="{rowspan}">{cell_value}</td>')
-        # Lot_Num, Mold_start (no merge)
-        html.append(f'<td>{row["Lot_Num"]}</td>')
-        html.append(f'<td class="date-col">{row["Mold_start"]}</td>')
-        # Data columns
-        for col in sum_cols:
-            html.append(f'<td>{int(row[col]) if pd.notnull(row[col]) else 0}</td>')
-        # Rejects column
-        html.append(f'<td class="rejects-col">{int(row[reject_col]) if pd.notnull(row[reject_col]) else 0}</td>')
-        html.append('</tr>')
-
-        # Total row after group
-        if row['_group_row'] == row['_group_rowspan'] - 1:
-            group_mask = (
-                (df['PO'] == row['PO']) &
-                (df['dEnd'] == row['dEnd']) &
-                (df['Prod_Code'] == row['Prod_Code']) &
-                (df['Quantity'] == row['Quantity'])
-            )
-            group_rows = df[group_mask]
-            totals = group_rows[sum_cols + [reject_col]].sum()
-            total_row = '<tr style="background-color:#222;color:yellow;font-weight:bold;vertical-align:top;">'
-            total_row += f'<td class="merge-group" colspan="4">Total</td>'
-            total_row += '<td></td><td></td>'
+    if compact:
+        # Rows are rendered in the browser from the embedded JSON
+        html.append('</tbody></table>')
+        html.append(embed_table('report_table', compact_payload(df, columns, sum_cols, reject_col)))
+        html.append(table_script)
+    else:
+        for idx, row in df.iterrows():
+            html.append('<tr>')
+            # PO, dEnd, Prod_Code, Quantity: only render at first of group
+            for col in ['PO', 'dEnd', 'Prod_Code', 'Quantity']:
+                if row['_group_row'] == 0:
+                    rowspan = int(row['_group_rowspan'])
+                    cell_value = row[col]
+                    if col == 'Prod_Code':
+                        cell_value = f"<b>{cell_value}</b>"
+                    style_extra = ' date-col' if col == 'dEnd' else ''
+                    html.append(f'<td class="merge-group{style_extra}{ " prod-code" if col=="Prod_Code" else "" }" rowspan="{rowspan}">{cell_value}</td>')
+            # Lot_Num, Mold_start (no merge)
+            html.append(f'<td>{row["Lot_Num"]}</td>')
+            html.append(f'<td class="date-col">{row["Mold_start"]}</td>')
+            # Data columns
             for col in sum_cols:
-                total_row += f'<td>{int(totals[col]) if pd.notnull(totals[col]) else 0}</td>'
-            total_row += f'<td class="rejects-col">{int(totals[reject_col]) if pd.notnull(totals[reject_col]) else 0}</td>'
-            total_row += '</tr>'
-            html.append(total_row)
-    html.append('</tbody></table>')
+                html.append(f'<td>{int(row[col]) if pd.notnull(row[col]) else 0}</td>')
+            # Rejects column
+            html.append(f'<td class="rejects-col">{int(row[reject_col]) if pd.notnull(row[reject_col]) else 0}</td>')
+            html.append('</tr>')
+
+            # Total row after group
+            if row['_group_row'] == row['_group_rowspan'] - 1:
+                group_mask = (
+                    (df['PO'] == row['PO']) &
+                    (df['dEnd'] == row['dEnd']) &
+                    (df['Prod_Code'] == row['Prod_Code']) &
+                    (df['Quantity'] == row['Quantity'])
+                )
+                group_rows = df[group_mask]
+                totals = group_rows[sum_cols + [reject_col]].sum()
+                total_row = '<tr style="background-color:#222;color:yellow;font-weight:bold;vertical-align:top;">'
+                total_row += f'<td class="merge-group" colspan="4">Total</td>'
+                total_row += '<td></td><td></td>'
+                for col in sum_cols:
+                    total_row += f'<td>{int(totals[col]) if pd.notnull(totals[col]) else 0}</td>'
+                total_row += f'<td class="rejects-col">{int(totals[reject_col]) if pd.notnull(totals[reject_col]) else 0}</td>'
+                total_row += '</tr>'
+                html.append(total_row)
+        html.append('</tbody></table>')
 
     # CSS Styling
     style = """
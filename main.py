@@ -1,10 +1,20 @@
 import os
+import sys
+import ast
+import glob
 import pandas as pd
 import numpy as np
 import warnings, code
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 from generate_prod_report import generate_prod_report
 from generate_boss_report import generate_boss_report
+from generate_dashboard import generate_dashboard
+from output_writer import OutputWriter
+from stage_pivot import stage_col_names, pivot_stages
+from snapshot_store import open_store, save_pivot
+from product_cache import ProductCache
+from scheduler import discover_targets, within_budget
 
 warnings.filterwarnings("ignore")
 
@@ -38,57 +48,131 @@ def custom_agg(series):
     else:
         return '<br>'.join(str(item) for item in series.unique())
 
-stage_col_names = ["Mold", "Subcon", "Receive", "Count", "QA", "Pack", "WHS"]
+def expand_lot_paths(value):
+    """`Lot` may be a single workbook, a glob, or a list literal of either.
 
-def compute_rejects_row(row, stage_cols):
-    mold_value = row['Mold'] if pd.notnull(row['Mold']) else 0
-    last_val = 0
-    for col in stage_cols[1:]:
-        val = row[col] if pd.notnull(row[col]) else 0
-        if val > 0:
-            last_val = val
-    diff = mold_value - last_val
-    return diff if diff > 0 else 0
+    An entry written as plant=path names the plant of the workbooks it
+    matches. Returns the workbook paths and the plant of each.
+    """
+    value = value.strip()
+    if value.startswith('['):
+        entries = ast.literal_eval(value)
+    else:
+        entries = [value]
+    paths = []
+    named = []
+    for entry in entries:
+        plant = None
+        name, sep, rest = entry.partition('=')
+        if sep and name.strip() and not any(c in name for c in '/\\'):
+            plant, entry = name.strip(), rest.strip()
+        matches = sorted(glob.glob(entry))
+        matches = matches if matches else [entry]
+        paths.extend(matches)
+        named.extend([plant] * len(matches))
+    return paths, plant_tags(paths, named)
+
+def plant_tags(paths, named):
+    """Plant of each workbook: its name from `named`, else the shortest trailing
+    part of its path that the other unnamed workbooks do not share.
+
+    PlantA/Lot Monitoring.xlsx and PlantB/Lot Monitoring.xlsx give PlantA and PlantB.
+    """
+    unnamed = [i for i, plant in enumerate(named) if plant is None]
+    parts = [os.path.splitext(os.path.abspath(paths[i]))[0].split(os.sep) for i in unnamed]
+    if len(set(map(tuple, parts))) < len(parts):
+        raise ValueError(f"Lot lists a workbook more than once: {', '.join(paths)}")
+    if len(parts) > 1:
+        # Drop the trailing parts every workbook shares, such as a common file name
+        while all(len(p) > 1 for p in parts) and len({p[-1] for p in parts}) == 1:
+            parts = [p[:-1] for p in parts]
+    depth = 1
+    while len({tuple(p[-depth:]) for p in parts}) < len(parts):
+        depth += 1
+    tags = list(named)
+    for i, p in zip(unnamed, parts):
+        tags[i] = '/'.join(p[-depth:])
+    clashes = {tags[i] for i in unnamed} & {plant for plant in named if plant is not None}
+    if clashes:
+        raise ValueError(f"Lot workbook plant names clash: {', '.join(sorted(clashes))}; name them with plant=path")
+    return tags
+
+def load_movements(path, plant):
+    """Parse one Lot Monitoring workbook into the long movement schema, tagged with its plant."""
+    df_movements = pd.read_excel(path, sheet_name="Lot Monitoring", header=2)
+    df_movements = df_movements[['Part Code', 'Lot No.', 'QTY', 'Actual Date', 'Qty', 'DR Date', 'Qty Received', 'Actual Date.1', 'QTY.1', 'Actual Date.2', 'QTY.2','Actual Date.3', 'QTY.3', 'Date', 'Qty.1']].dropna(subset=['Part Code'])
+    df_movements.columns = ['Prod_Code', 'Mold_date', 'Mold_Qty', 'Subcon_Date', 'Subcon_Qty', 'Receive_Date', 'Receive_Qty', 'Count_Date','Count_Qty','QC_Date','QC_Qty','Pack_Date','Pack_Qty','WHS_Date','WHS_Qty' ]
+    df_movements['Lot_Num'] = df_movements['Mold_date']
+    df_movements['Mold_date'] = df_movements['Mold_date'].str.split('-').str[0]
+    df_movements['Mold_date'] = pd.to_datetime(df_movements['Mold_date'], format='%y%m%d')
+    df_movements['Mold_start'] = df_movements['Mold_date'].dt.date
 
-if __name__ == "__main__":
-    config = fetch_config()
-    Plan = config.get("Plan")
-    Lot = config.get("Lot")
-    targets = eval(config.get("targets"))
-    df_orders = pd.read_excel(Plan, sheet_name="PurchaseOrder", header=1)
-    df_orders = df_orders[['Sales Order No.','P/O DATE','PO#','PRODUCT CODE','P/O QTY','Target Del. Date']].dropna(subset=['Sales Order No.'])
-    df_orders.columns = ['SO', 'PO_Date', 'PO', 'Prod_Code','Quantity','Delivery_Date']
-    df_orders['PO_Date'] = pd.to_datetime(df_orders['PO_Date'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
-    df_orders['Delivery_Date'] = pd.to_datetime(df_orders['Delivery_Date'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
+    for col in ['Mold_date','Subcon_Date','Receive_Date','Count_Date','QC_Date','Pack_Date','WHS_Date']:
+        try:
+            df_movements[col] = df_movements[col].dt.date
+        except:
+            df_movements[col] = pd.to_datetime(df_movements[col], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
 
-    # 1. Modify df_compute to fetch Daily Output and Finished Product Beg. Bal.
-    df_compute = pd.read_excel(
-        Plan,
-        sheet_name="Computation",
-        header=4
-    )
-    compute_cols = [
-        'OFFICIAL PRODUCT CODE         (Use by Production)',
-        'Delivery Date',
-        'Ordered Qty.',
-        "No. of Day's",
-        'Target Start',
-        'Daily Output',
-        'Finished Product Beg. Bal.'
-    ]
-    df_compute = df_compute[compute_cols].dropna(subset=['Ordered Qty.'])
-    df_compute.columns = [
-        'Prod_Code',
-        'Delivery_Date',
-        'Quantity',
-        'Days',
-        'Target_Start',
-        'Daily_Output',
-        'Inventory'
+    mold_df = df_movements[['Prod_Code', 'Lot_Num', 'Mold_start', 'Mold_date','Mold_Qty']].dropna(subset=['Mold_date'])
+    subcon_df = df_movements[['Prod_Code', 'Lot_Num', 'Mold_start','Subcon_Date','Subcon_Qty']].dropna(subset=['Subcon_Date'])
+    receive_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','Receive_Date','Receive_Qty']].dropna(subset=['Receive_Date'])
+    count_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','Count_Date','Count_Qty']].dropna(subset=['Count_Date'])
+    qc_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','QC_Date','Count_Qty']].dropna(subset=['QC_Date'])
+    pack_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','Pack_Date','Count_Qty']].dropna(subset=['Pack_Date'])
+    whs_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','WHS_Date','Count_Qty']].dropna(subset=['WHS_Date'])
+
+    mold_df['Source'] = 'Mold'
+    subcon_df['Source'] = 'Subcon'
+    receive_df['Source'] = 'Receive'
+    count_df['Source'] = 'Count'
+    qc_df['Source'] = 'QA'
+    pack_df['Source'] = 'Pack'
+    whs_df['Source'] = 'WHS'
+
+    column_val = ['Prod_Code', 'Lot_Num','Mold_start','Date','Qty','Source']
+    mold_df.columns = column_val
+    subcon_df.columns = column_val
+    receive_df.columns = column_val
+    count_df.columns = column_val
+    qc_df.columns = column_val
+    pack_df.columns = column_val
+    whs_df.columns = column_val
+
+    move_df = pd.concat([mold_df,subcon_df,receive_df,count_df,qc_df,pack_df,whs_df])
+    move_df['Plant'] = plant
+    return move_df
+
+def qualify_lot_nums(move_df):
+    """Prefix Lot_Num with its plant; lot numbers are only unique within one plant's workbook."""
+    move_df['Lot_Num'] = move_df['Plant'] + '/' + move_df['Lot_Num'].astype(str)
+    return move_df
+
+def fill_daily_output(row, df_compute):
+    if pd.notnull(row['Daily_Output']):
+        return row['Daily_Output']
+    matches = df_compute[
+        df_compute['Prod_Code_lower'] == str(row['Prod_Code']).lower()
     ]
-    df_compute['Delivery_Date'] = pd.to_datetime(df_compute['Delivery_Date'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
-    df_compute['Target_Start'] = pd.to_datetime(df_compute['Target_Start'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
+    if not matches.empty:
+        output = matches['Daily_Output'].dropna()
+        if not output.empty:
+            return output.iloc[0]
+    return np.nan
 
+def compute_mold_end(row):
+    try:
+        mold_start = pd.to_datetime(row['dStart'])
+        quantity = row['Quantity']
+        daily_output = row['Daily_Output']
+        if pd.isnull(mold_start) or pd.isnull(quantity) or pd.isnull(daily_output) or daily_output == 0:
+            return pd.NaT
+        num_days = int(np.ceil(quantity / daily_output))
+        return (mold_start + pd.Timedelta(days=num_days))
+    except Exception:
+        return pd.NaT
+
+def build_job(df_orders, df_compute):
+    """Join PurchaseOrder and Computation rows into the per-PO job table."""
     # 2. Modify merge to be case-insensitive for columns Prod_Code
     df_orders['Prod_Code_lower'] = df_orders['Prod_Code'].str.lower()
     df_orders['Delivery_Date_str'] = df_orders['Delivery_Date'].astype(str)
@@ -115,181 +199,226 @@ if __name__ == "__main__":
     df_main['dEnd'] = df_main['Delivery_Date']
 
     # 3. Fill Daily_Output nulls by searching df_compute by Prod_Code (case-insensitive)
-    def fill_daily_output(row, df_compute):
-        if pd.notnull(row['Daily_Output']):
-            return row['Daily_Output']
-        matches = df_compute[
-            df_compute['Prod_Code_lower'] == str(row['Prod_Code']).lower()
-        ]
-        if not matches.empty:
-            output = matches['Daily_Output'].dropna()
-            if not output.empty:
-                return output.iloc[0]
-        return np.nan
-
     df_main['Daily_Output'] = df_main.apply(lambda row: fill_daily_output(row, df_compute), axis=1)
 
     # Inventory column is already in df_main, as merged
 
     # ========== Mold_End computation logic ==========
-    def compute_mold_end(row):
-        try:
-            mold_start = pd.to_datetime(row['dStart'])
-            quantity = row['Quantity']
-            daily_output = row['Daily_Output']
-            if pd.isnull(mold_start) or pd.isnull(quantity) or pd.isnull(daily_output) or daily_output == 0:
-                return pd.NaT
-            num_days = int(np.ceil(quantity / daily_output))
-            return (mold_start + pd.Timedelta(days=num_days))
-        except Exception:
-            return pd.NaT
-
     df_main['Mold_End'] = df_main.apply(compute_mold_end, axis=1)
 
-    # ========== Store Mold_End in df_job ==========
-    df_job = df_main[['SO','PO','dStart','dEnd','Prod_Code','Quantity','Days','Daily_Output','Inventory','Mold_End']]
+    return df_main[['SO','PO','dStart','dEnd','Prod_Code','Quantity','Days','Daily_Output','Inventory','Mold_End']]
+
+def export_target(df_job, target):
+    """One row per (SO, Prod_Code) of the target SO, aggregated with custom_agg."""
+    df_export = df_job[df_job['SO']==target]
+    return df_export.groupby(['SO', 'Prod_Code']).agg(custom_agg).reset_index()
+
+def build_pivot(df_export, main_move_df):
+    """Row-wise lot window and pivot for one SO; returns (pivot_table, updated_mold_ends)."""
+    # Merge Daily_Output and Mold_End into main_move_df for this SO/prod code
+    key_merge = pd.merge(df_export, main_move_df, how='inner', on='Prod_Code')
+
+    # Convert to datetime for filtering
+    key_merge['Mold_start_dt'] = pd.to_datetime(key_merge['Mold_start'])
+    key_merge['dStart_dt'] = pd.to_datetime(key_merge['dStart'])
+    key_merge['Mold_End_dt'] = pd.to_datetime(key_merge['Mold_End'])
+
+    # --- EXTENDED LOGIC: Expand Mold_End if quantity > sum of Mold up to max 30 days ---
+    # For each (SO, Prod_Code), adjust Mold_End if necessary
+    updated_mold_ends = {}
+    for idx, row in key_merge.iterrows():
+        so = row['SO']
+        prod_code = row['Prod_Code']
+        quantity = row['Quantity']
+        dstart = row['dStart_dt']
+        orig_mold_end = row['Mold_End_dt']
+        lot_num = row['Lot_Num']
+
+        # Only check if values are valid
+        if pd.isnull(dstart) or pd.isnull(orig_mold_end):
+            updated_mold_ends[(so, prod_code)] = orig_mold_end
+            continue
 
-    df_movements = pd.read_excel(Lot, sheet_name="Lot Monitoring", header=2)
-    df_movements = df_movements[['Part Code', 'Lot No.', 'QTY', 'Actual Date', 'Qty', 'DR Date', 'Qty Received', 'Actual Date.1', 'QTY.1', 'Actual Date.2', 'QTY.2','Actual Date.3', 'QTY.3', 'Date', 'Qty.1']].dropna(subset=['Part Code'])
-    df_movements.columns = ['Prod_Code', 'Mold_date', 'Mold_Qty', 'Subcon_Date', 'Subcon_Qty', 'Receive_Date', 'Receive_Qty', 'Count_Date','Count_Qty','QC_Date','QC_Qty','Pack_Date','Pack_Qty','WHS_Date','WHS_Qty' ]
-    df_movements['Lot_Num'] = df_movements['Mold_date']
-    df_movements['Mold_date'] = df_movements['Mold_date'].str.split('-').str[0]
-    df_movements['Mold_date'] = pd.to_datetime(df_movements['Mold_date'], format='%y%m%d')
-    df_movements['Mold_start'] = df_movements['Mold_date'].dt.date
+        # We want to increase Mold_End one day at a time
+        # while sum of Mold < quantity, and maximum 30 days extension
+        curr_end = orig_mold_end
+        days_added = 0
+        key_merge_mold = key_merge[key_merge['Source']=='Mold']
+        while days_added < 30:
+            # Select lots in the date window
+            mask = (key_merge_mold['Prod_Code'] == prod_code) & \
+                   (key_merge_mold['Mold_start_dt'] >= dstart) & \
+                   (key_merge_mold['Mold_start_dt'] <= curr_end)
+            sum_mold = key_merge_mold.loc[mask][['Lot_Num','Qty']].drop_duplicates()['Qty'].sum()
+            if sum_mold >= quantity:
+                break
+            # else, extend by 3 day
+            curr_end += pd.Timedelta(days=1)
+            days_added += 1
+        updated_mold_ends[(so, prod_code)] = curr_end
+
+    # Overwrite Mold_End_dt with the possibly extended value
+    key_merge['Mold_End_dt'] = key_merge.apply(
+        lambda row: updated_mold_ends.get((row['SO'], row['Prod_Code']), row['Mold_End_dt']),
+        axis=1
+    )
 
-    for col in ['Mold_date','Subcon_Date','Receive_Date','Count_Date','QC_Date','Pack_Date','WHS_Date']:
-        try:
-            df_movements[col] = df_movements[col].dt.date
-        except:
-            df_movements[col] = pd.to_datetime(df_movements[col], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
+    # Now use the extended Mold_End in list_filter
+    list_filter = key_merge[
+        (key_merge['Mold_start_dt'] >= key_merge['dStart_dt']) &
+        (key_merge['Mold_start_dt'] <= key_merge['Mold_End_dt'])
+    ][['Prod_Code','Lot_Num']]
 
-    mold_df = df_movements[['Prod_Code', 'Lot_Num', 'Mold_start', 'Mold_date','Mold_Qty']].dropna(subset=['Mold_date'])
-    subcon_df = df_movements[['Prod_Code', 'Lot_Num', 'Mold_start','Subcon_Date','Subcon_Qty']].dropna(subset=['Subcon_Date'])
-    receive_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','Receive_Date','Receive_Qty']].dropna(subset=['Receive_Date'])
-    count_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','Count_Date','Count_Qty']].dropna(subset=['Count_Date'])
-    qc_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','QC_Date','Count_Qty']].dropna(subset=['QC_Date'])
-    pack_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','Pack_Date','Count_Qty']].dropna(subset=['Pack_Date'])
-    whs_df = df_movements[['Prod_Code', 'Lot_Num','Mold_start','WHS_Date','Count_Qty']].dropna(subset=['WHS_Date'])
+    list_filter['merged'] = list_filter['Lot_Num']+list_filter['Prod_Code']
+    key_merge['merged'] = key_merge['Lot_Num']+key_merge['Prod_Code']
+    key_merge = key_merge[key_merge['merged'].isin(list_filter['merged'])]
+    filtered = key_merge[(key_merge['Date'] >= key_merge['dStart'])]
 
-    mold_df['Source'] = 'Mold'
-    subcon_df['Source'] = 'Subcon'
-    receive_df['Source'] = 'Receive'
-    count_df['Source'] = 'Count'
-    qc_df['Source'] = 'QA'
-    pack_df['Source'] = 'Pack'
-    whs_df['Source'] = 'WHS'
+    # Pivot table for both reports
+    pivot_table = pivot_stages(filtered)
 
-    column_val = ['Prod_Code', 'Lot_Num','Mold_start','Date','Qty','Source']
-    mold_df.columns = column_val
-    subcon_df.columns = column_val
-    receive_df.columns = column_val
-    count_df.columns = column_val
-    qc_df.columns = column_val
-    pack_df.columns = column_val
-    whs_df.columns = column_val
+    return pivot_table, updated_mold_ends
 
-    main_move_df = pd.concat([mold_df,subcon_df,receive_df,count_df,qc_df,pack_df,whs_df])
-    main_move_df['Qty'] = np.ceil(main_move_df['Qty'])
+if __name__ == "__main__":
+    config = fetch_config()
+    Plan = config.get("Plan")
+    Lot = config.get("Lot")
 
-    for target in targets:
-        print("Processing: " + target)
-        df_export = df_job[df_job['SO']==target]
-        try:
-            df_export = df_export.groupby(['SO', 'Prod_Code']).agg(custom_agg).reset_index()
-        except:
-            with open(f"./Output/{target}.txt", "w") as z:
-                z.write("SO Does not Exist")
-            continue
+    # Boss=per_so writes BOSS-<SO>.html, Boss=dashboard one BOSS-DASHBOARD.html for all SOs, Boss=both does both
+    boss_mode = config.get("Boss", "per_so")
+    if boss_mode not in ("per_so", "dashboard", "both"):
+        raise ValueError(f"Boss must be per_so, dashboard or both, got: {boss_mode}")
 
-        # Merge Daily_Output and Mold_End into main_move_df for this SO/prod code
-        key_merge = pd.merge(df_export, main_move_df, how='inner', on='Prod_Code')
-
-        # Convert to datetime for filtering
-        key_merge['Mold_start_dt'] = pd.to_datetime(key_merge['Mold_start'])
-        key_merge['dStart_dt'] = pd.to_datetime(key_merge['dStart'])
-        key_merge['Mold_End_dt'] = pd.to_datetime(key_merge['Mold_End'])
-
-        # --- EXTENDED LOGIC: Expand Mold_End if quantity > sum of Mold up to max 30 days ---
-        # For each (SO, Prod_Code), adjust Mold_End if necessary
-        updated_mold_ends = {}
-        for idx, row in key_merge.iterrows():
-            so = row['SO']
-            prod_code = row['Prod_Code']
-            quantity = row['Quantity']
-            dstart = row['dStart_dt']
-            orig_mold_end = row['Mold_End_dt']
-            lot_num = row['Lot_Num']
-
-            # Only check if values are valid
-            if pd.isnull(dstart) or pd.isnull(orig_mold_end):
-                updated_mold_ends[(so, prod_code)] = orig_mold_end
-                continue
+    df_orders = pd.read_excel(Plan, sheet_name="PurchaseOrder", header=1)
+    df_orders = df_orders[['Sales Order No.','P/O DATE','PO#','PRODUCT CODE','P/O QTY','Target Del. Date']].dropna(subset=['Sales Order No.'])
+    df_orders.columns = ['SO', 'PO_Date', 'PO', 'Prod_Code','Quantity','Delivery_Date']
+    df_orders['PO_Date'] = pd.to_datetime(df_orders['PO_Date'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
+    df_orders['Delivery_Date'] = pd.to_datetime(df_orders['Delivery_Date'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
 
-            # We want to increase Mold_End one day at a time
-            # while sum of Mold < quantity, and maximum 30 days extension
-            curr_end = orig_mold_end
-            days_added = 0
-            key_merge_mold = key_merge[key_merge['Source']=='Mold']
-            while days_added < 30:
-                # Select lots in the date window
-                mask = (key_merge_mold['Prod_Code'] == prod_code) & \
-                       (key_merge_mold['Mold_start_dt'] >= dstart) & \
-                       (key_merge_mold['Mold_start_dt'] <= curr_end)
-                sum_mold = key_merge_mold.loc[mask][['Lot_Num','Qty']].drop_duplicates()['Qty'].sum()
-                if sum_mold >= quantity:
-                    break
-                # else, extend by 3 day
-                curr_end += pd.Timedelta(days=1)
-                days_added += 1
-            updated_mold_ends[(so, prod_code)] = curr_end
-
-        # Overwrite Mold_End_dt with the possibly extended value
-        key_merge['Mold_End_dt'] = key_merge.apply(
-            lambda row: updated_mold_ends.get((row['SO'], row['Prod_Code']), row['Mold_End_dt']),
-            axis=1
-        )
+    # 1. Modify df_compute to fetch Daily Output and Finished Product Beg. Bal.
+    df_compute = pd.read_excel(
+        Plan,
+        sheet_name="Computation",
+        header=4
+    )
+    compute_cols = [
+        'OFFICIAL PRODUCT CODE         (Use by Production)',
+        'Delivery Date',
+        'Ordered Qty.',
+        "No. of Day's",
+        'Target Start',
+        'Daily Output',
+        'Finished Product Beg. Bal.'
+    ]
+    df_compute = df_compute[compute_cols].dropna(subset=['Ordered Qty.'])
+    df_compute.columns = [
+        'Prod_Code',
+        'Delivery_Date',
+        'Quantity',
+        'Days',
+        'Target_Start',
+        'Daily_Output',
+        'Inventory'
+    ]
+    df_compute['Delivery_Date'] = pd.to_datetime(df_compute['Delivery_Date'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
+    df_compute['Target_Start'] = pd.to_datetime(df_compute['Target_Start'], errors='coerce', utc=True).dt.tz_convert('Asia/Hong_Kong').dt.date
 
-        #code.interact(local=locals())
-        # Now use the extended Mold_End in list_filter
-        list_filter = key_merge[
-            (key_merge['Mold_start_dt'] >= key_merge['dStart_dt']) &
-            (key_merge['Mold_start_dt'] <= key_merge['Mold_End_dt'])
-        ][['Prod_Code','Lot_Num']]
-
-        list_filter['merged'] = list_filter['Lot_Num']+list_filter['Prod_Code']
-        key_merge['merged'] = key_merge['Lot_Num']+key_merge['Prod_Code']
-        key_merge = key_merge[key_merge['merged'].isin(list_filter['merged'])]
-        filtered = key_merge[(key_merge['Date'] >= key_merge['dStart'])]
-
-        # Pivot table for both reports
-        pivot_table = pd.pivot_table(
-            filtered,
-            index=['PO','dEnd', 'Prod_Code', 'Quantity', 'Lot_Num', 'Mold_start', 'Daily_Output'],
-            columns='Source',
-            values='Qty',
-            aggfunc='sum',
-            fill_value=0
-        )
-        desired_order = ['Mold', 'Subcon', 'Receive', 'Count', 'QA', 'Pack', 'WHS']
-        for col in desired_order:
-            if col not in pivot_table.columns:
-                pivot_table[col] = 0
-        pivot_table = pivot_table[desired_order]
-
-        pivot_table['Rejects'] = pivot_table.apply(
-            lambda row: compute_rejects_row(row, desired_order), axis=1
+    df_job = build_job(df_orders, df_compute)
+
+    # Each plant keeps its own workbook; parse them side by side and concatenate once
+    lot_paths, plants = expand_lot_paths(Lot)
+    if len(lot_paths) == 1:
+        move_parts = [load_movements(lot_paths[0], plants[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(lot_paths), os.cpu_count() or 1)) as pool:
+            move_parts = list(pool.map(load_movements, lot_paths, plants))
+    main_move_df = pd.concat(move_parts)
+    if len(lot_paths) > 1:
+        main_move_df = qualify_lot_nums(main_move_df)
+    main_move_df['Qty'] = np.ceil(main_move_df['Qty'])
+
+    # An explicit targets list is processed as given; targets=auto (or no targets key)
+    # picks the open SOs due by the horizon, overdue ones included, most urgent first
+    targets_value = config.get("targets", "auto")
+    if targets_value.strip() == "auto":
+        targets = discover_targets(
+            df_job,
+            main_move_df,
+            horizon_days=int(config.get("Horizon", 30)),
+            lookback_days=int(config["Lookback"]) if config.get("Lookback") else None
         )
+        print(f"Scheduled {len(targets)} open SO(s): {', '.join(map(str, targets))}")
+    else:
+        targets = ast.literal_eval(targets_value)
+    time_budget = float(config["TimeBudget"]) if config.get("TimeBudget") else None
+
+    # Engine=memo shares per-product window work between SOs ordering the same Prod_Code
+    if config.get("Engine", "legacy") == "memo":
+        product_cache = ProductCache(max_entries=int(config.get("CacheSize", 256)))
+        product_cache.bind(main_move_df)
+        pivot_engine = product_cache.build_pivot
+    else:
+        pivot_engine = build_pivot
+
+    # Rendering of the next SO overlaps with writing the previous one to ./Output
+    writer = OutputWriter(
+        max_workers=int(config.get("Writers", 2)),
+        max_pending=int(config.get("WriteQueue", 8))
+    )
+
+    # Optional history store of every run's per-SO pivot rows
+    snapshot_path = config.get("Snapshot")
+    store = open_store(snapshot_path) if snapshot_path else None
+    run_date = datetime.now().isoformat(timespec='seconds')
+
+    # Format=json embeds the tables as columnar JSON rendered in the browser
+    compact = config.get("Format", "html") == "json"
 
-        idx_cols = ['PO','dEnd', 'Prod_Code', 'Quantity', 'Lot_Num', 'Mold_start', 'Daily_Output']
-        sum_cols = desired_order
+    dashboard_parts = []
 
-        # Generate and save both reports
-        print("Generating PROD HTML")
-        html_prod = generate_prod_report(pivot_table, idx_cols, sum_cols, reject_col="Rejects", so_value=target)
-        with open(f"./Output/PROD-{target}.html", "w") as f:
-            f.write(html_prod)
+    # Drain the writer and close the store even if an SO fails part way through
+    write_errors = []
+    try:
+        for target in within_budget(targets, time_budget):
+            print("Processing: " + str(target))
+            try:
+                df_export = export_target(df_job, target)
+            except:
+                writer.submit(f"./Output/{target}.txt", "SO Does not Exist")
+                continue
 
-        print("Generating BOSS HTML")
-        html_boss = generate_boss_report(pivot_table, so_value=target)
-        with open(f"./Output/BOSS-{target}.html", "w") as f:
-            f.write(html_boss)
+            pivot_table, updated_mold_ends = pivot_engine(df_export, main_move_df)
+
+            if store is not None:
+                mold_ends = {prod_code: mold_end for (so, prod_code), mold_end in updated_mold_ends.items()}
+                save_pivot(store, run_date, target, pivot_table, mold_ends)
+
+            idx_cols = ['PO','dEnd', 'Prod_Code', 'Quantity', 'Lot_Num', 'Mold_start', 'Daily_Output']
+            sum_cols = stage_col_names
+
+            # Generate and save both reports
+            print("Generating PROD HTML")
+            html_prod = generate_prod_report(pivot_table, idx_cols, sum_cols, reject_col="Rejects", so_value=target, compact=compact)
+            writer.submit(f"./Output/PROD-{target}.html", html_prod)
+
+            if boss_mode in ("dashboard", "both"):
+                dashboard_parts.append(pivot_table.reset_index().assign(SO=target))
+
+            if boss_mode in ("per_so", "both"):
+                print("Generating BOSS HTML")
+                html_boss = generate_boss_report(pivot_table, so_value=target, compact=compact)
+                writer.submit(f"./Output/BOSS-{target}.html", html_boss)
+
+        if dashboard_parts:
+            print("Generating BOSS dashboard")
+            writer.submit("./Output/BOSS-DASHBOARD.html", generate_dashboard(pd.concat(dashboard_parts, ignore_index=True)))
+    finally:
+        if store is not None:
+            store.close()
+
+        print("Waiting for output writes to finish")
+        write_errors = writer.close()
+        for e in write_errors:
+            print(f"Error writing output: {e}")
+    if write_errors:
+        sys.exit(1)
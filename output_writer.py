@@ -0,0 +1,74 @@
+import os
+import stat
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def _read_umask():
+    # The umask can only be read by setting it, which is process-wide
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Read at import, before any thread can create files while the umask is 0
+process_umask = _read_umask()
+
+class OutputWriter:
+    """Writes report files on a background thread pool.
+
+    At most `max_pending` writes may be queued at once; `submit` blocks when
+    the queue is full so rendering never runs too far ahead of the disk.
+    Each file is written to a temp file in the target directory and then
+    renamed over the destination, so readers never see a partial report.
+    A report that already exists keeps its mode; a new one gets the mode
+    open(path, "w") would give it under `umask`.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, umask=process_umask):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="output-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = []
+        self._umask = umask
+
+    def submit(self, path, text):
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._write, path, text)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        return future
+
+    def _write(self, path, text):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(path)[1])
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates files as 0600
+            try:
+                mode = stat.S_IMODE(os.stat(path).st_mode)
+            except FileNotFoundError:
+                mode = 0o666 & ~self._umask
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def close(self):
+        """Wait for every queued write and return the list of failures."""
+        self._pool.shutdown(wait=True)
+        errors = []
+        for future in self._futures:
+            exc = future.exception()
+            if exc is not None:
+                errors.append(exc)
+        self._futures = []
+        return errors
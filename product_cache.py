@@ -0,0 +1,118 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from stage_pivot import pivot_stages
+
+def _key_value(val):
+    return None if pd.isnull(val) else val
+
+class ProductCache:
+    """Per-product memo of mold windows and per-lot stage sums shared across SOs.
+
+    `build_pivot` is a drop-in replacement for main.build_pivot. Window
+    results are keyed by (Prod_Code, dStart, Mold_End, Quantity) and held
+    in an LRU of at most `max_entries` items. The cache is bound to one
+    movements frame; binding a frame with different contents clears it.
+    Edits made in place to the bound frame need an explicit `bind` call.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._windows = OrderedDict()
+        self._mold_sums = OrderedDict()
+        self._movements = None
+        self._fingerprint = None
+        self._rows = {}
+
+    def bind(self, main_move_df):
+        fingerprint = int(pd.util.hash_pandas_object(main_move_df, index=False).sum())
+        if fingerprint != self._fingerprint:
+            self._windows.clear()
+            self._mold_sums.clear()
+            self._fingerprint = fingerprint
+        self._movements = main_move_df
+        rows = main_move_df[['Prod_Code', 'Lot_Num', 'Mold_start', 'Date', 'Qty', 'Source']].copy()
+        rows['Mold_start_dt'] = pd.to_datetime(rows['Mold_start'])
+        self._rows = {prod_code: group for prod_code, group in rows.groupby('Prod_Code', sort=False)}
+
+    def _lru_get(self, store, key, compute):
+        if key in store:
+            store.move_to_end(key)
+            return store[key]
+        value = compute()
+        store[key] = value
+        if len(store) > self.max_entries:
+            store.popitem(last=False)
+        return value
+
+    def _compute_mold_sums(self, prod_code):
+        # A lot's Mold_start comes from its Lot_Num, so de-duplicating once per
+        # product gives the same lots as de-duplicating inside every window
+        rows = self._rows[prod_code]
+        mold = rows[rows['Source'] == 'Mold'][['Lot_Num', 'Qty', 'Mold_start_dt']].drop_duplicates(['Lot_Num', 'Qty'])
+        mold = mold.sort_values('Mold_start_dt', kind='mergesort')
+        starts = mold['Mold_start_dt'].values
+        cum_qty = np.concatenate([[0.0], np.cumsum(mold['Qty'].fillna(0).values)])
+        return starts, cum_qty
+
+    def _compute_window(self, prod_code, dstart, dstart_dt, orig_mold_end, quantity):
+        starts, cum_qty = self._lru_get(self._mold_sums, prod_code, lambda: self._compute_mold_sums(prod_code))
+        lo = np.searchsorted(starts, dstart_dt.to_datetime64(), side='left')
+
+        # Same extension rule as main.build_pivot: one day at a time, up to 30 days
+        curr_end = orig_mold_end
+        days_added = 0
+        while days_added < 30:
+            hi = np.searchsorted(starts, curr_end.to_datetime64(), side='right')
+            sum_mold = cum_qty[hi] - cum_qty[lo] if hi > lo else 0.0
+            if sum_mold >= quantity:
+                break
+            curr_end += pd.Timedelta(days=1)
+            days_added += 1
+
+        rows = self._rows[prod_code]
+        in_window = rows[
+            (rows['Mold_start_dt'] >= dstart_dt) &
+            (rows['Mold_start_dt'] <= curr_end) &
+            (rows['Date'] >= dstart)
+        ]
+        stage_sums = (
+            in_window
+            .groupby(['Prod_Code', 'Lot_Num', 'Mold_start', 'Source'], sort=False)['Qty']
+            .sum()
+            .reset_index()
+        )
+        return curr_end, stage_sums
+
+    def build_pivot(self, df_export, main_move_df):
+        if main_move_df is not self._movements:
+            self.bind(main_move_df)
+
+        df_export = df_export[df_export['Prod_Code'].isin(self._rows.keys())]
+        dstart_dts = pd.to_datetime(df_export['dStart'])
+        mold_end_dts = pd.to_datetime(df_export['Mold_End'])
+
+        updated_mold_ends = {}
+        parts = []
+        for so, prod_code, dstart, dstart_dt, orig_mold_end, quantity in zip(
+            df_export['SO'], df_export['Prod_Code'], df_export['dStart'],
+            dstart_dts, mold_end_dts, df_export['Quantity']
+        ):
+            if pd.isnull(dstart_dt) or pd.isnull(orig_mold_end):
+                updated_mold_ends[(so, prod_code)] = orig_mold_end
+                continue
+            key = (prod_code, _key_value(dstart), _key_value(orig_mold_end), _key_value(quantity))
+            curr_end, stage_sums = self._lru_get(
+                self._windows, key,
+                lambda: self._compute_window(prod_code, dstart, dstart_dt, orig_mold_end, quantity)
+            )
+            updated_mold_ends[(so, prod_code)] = curr_end
+            parts.append(stage_sums)
+
+        if parts:
+            stage_rows = pd.concat(parts)
+        else:
+            stage_rows = main_move_df.iloc[0:0][['Prod_Code', 'Lot_Num', 'Mold_start', 'Source', 'Qty']]
+        filtered = pd.merge(df_export, stage_rows, how='inner', on='Prod_Code')
+
+        return pivot_stages(filtered), updated_mold_ends
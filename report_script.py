@@ -0,0 +1,122 @@
+import json
+
+def embed_table(table_id, payload):
+    """JSON data block read by `table_script` to fill the tbody of `table_id`."""
+    data = json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+    return f'<script type="application/json" data-report-table="{table_id}">{data}</script>'
+
+# Shared client-side renderer for compact reports. The payload is columnar:
+#   data     one array per column, in header order; the merge columns
+#            have one value per group, the others one per row
+#   classes  td class per column
+#   bold     columns wrapped in <b>
+#   merge    leading columns rendered once per group with rowspan (0 = none)
+#   spans    group sizes, in row order (only when merge > 0)
+#   totals   columns summed into a Total row after each group (optional)
+# Only the groups near the viewport are in the DOM; spacer rows stand in
+# for the rest so the scrollbar keeps the size of the full table.
+table_script = """<script>
+(function () {
+  function renderTable(table, p) {
+    var tbody = table.tBodies[0];
+    var cols = p.data.length;
+    var n = cols ? p.data[cols - 1].length : 0;
+    var merge = p.merge || 0;
+    var totals = p.totals || null;
+    var bold = p.bold || [];
+    var spans = merge ? p.spans : [];
+    if (!merge) { for (var i = 0; i < n; i++) spans.push(1); }
+    var extra = totals ? 1 : 0;
+    var unitStart = [], unitOffset = [0], start = 0;
+    for (var u = 0; u < spans.length; u++) {
+      unitStart.push(start);
+      start += spans[u];
+      unitOffset.push(unitOffset[u] + spans[u] + extra);
+    }
+    var totalRows = unitOffset[spans.length];
+    var rowHeight = 28, overscan = 20, drawn = null, measured = false;
+
+    function td(c, v, attrs) {
+      var cls = p.classes[c];
+      return '<td' + (cls ? ' class="' + cls + '"' : '') + (attrs || '') + '>' + v + '</td>';
+    }
+    function unitHtml(u) {
+      var out = [], s = unitStart[u], len = spans[u], r, c;
+      for (r = s; r < s + len; r++) {
+        out.push('<tr>');
+        for (c = 0; c < cols; c++) {
+          if (c < merge && r !== s) continue;
+          var v = c < merge ? p.data[c][u] : p.data[c][r];
+          if (bold.indexOf(c) >= 0) v = '<b>' + v + '</b>';
+          out.push(td(c, v, c < merge ? ' rowspan="' + len + '"' : ''));
+        }
+        out.push('</tr>');
+      }
+      if (totals) {
+        out.push('<tr style="background-color:#222;color:yellow;font-weight:bold;vertical-align:top;">');
+        out.push('<td class="merge-group" colspan="' + merge + '">Total</td>');
+        for (c = merge; c < cols; c++) {
+          if (totals.indexOf(c) < 0) { out.push('<td></td>'); continue; }
+          var sum = 0;
+          for (r = s; r < s + len; r++) sum += p.data[c][r];
+          out.push(td(c, sum));
+        }
+        out.push('</tr>');
+      }
+      return out.join('');
+    }
+    function spacer(h) {
+      return h > 0 ? '<tr><td colspan="' + cols + '" style="height:' + h +
+        'px;padding:0;border:0;background:transparent!important"></td></tr>' : '';
+    }
+    function unitAt(row) {
+      var lo = 0, hi = spans.length - 1;
+      while (lo < hi) {
+        var mid = (lo + hi) >> 1;
+        if (unitOffset[mid + 1] > row) hi = mid; else lo = mid + 1;
+      }
+      return lo;
+    }
+    function draw() {
+      if (!spans.length) return;
+      var top = -tbody.getBoundingClientRect().top;
+      var first = unitAt(Math.max(0, Math.floor(top / rowHeight) - overscan));
+      var last = unitAt(Math.max(0, Math.floor((top + window.innerHeight) / rowHeight) + overscan));
+      if (drawn && drawn[0] === first && drawn[1] === last) return;
+      drawn = [first, last];
+      var above = unitOffset[first] * rowHeight;
+      var below = (totalRows - unitOffset[last + 1]) * rowHeight;
+      var body = [spacer(above)];
+      for (var u = first; u <= last; u++) body.push(unitHtml(u));
+      body.push(spacer(below));
+      tbody.innerHTML = body.join('');
+      if (!measured) {
+        // Calibrate the row height once from the rows actually drawn
+        measured = true;
+        var rows = unitOffset[last + 1] - unitOffset[first];
+        var height = tbody.offsetHeight - (above > 0 ? above : 0) - (below > 0 ? below : 0);
+        if (rows > 0 && height > 0) {
+          rowHeight = height / rows;
+          drawn = null;
+          draw();
+        }
+      }
+    }
+    var pending = false;
+    function schedule() {
+      if (pending) return;
+      pending = true;
+      window.requestAnimationFrame(function () { pending = false; draw(); });
+    }
+    // Capture, since the page body rather than the window may be the scroller
+    document.addEventListener('scroll', schedule, true);
+    window.addEventListener('resize', function () { drawn = null; schedule(); });
+    draw();
+  }
+  var blocks = document.querySelectorAll('script[data-report-table]');
+  for (var i = 0; i < blocks.length; i++) {
+    var table = document.getElementById(blocks[i].getAttribute('data-report-table'));
+    renderTable(table, JSON.parse(blocks[i].textContent));
+  }
+})();
+</script>"""
@@ -0,0 +1,81 @@
+import time
+from datetime import date, timedelta
+import pandas as pd
+
+def allocate_whs(jobs, whs):
+    """Hand out each product's WHS quantity to its jobs in dEnd order.
+
+    `jobs` has one row per (SO, Prod_Code) with dStart, dEnd and Quantity;
+    a job may only draw from WHS moves dated on or after its dStart, and
+    each move is used up once. Returns the allocated quantity per job row.
+    """
+    allocated = pd.Series(0.0, index=jobs.index)
+    whs_by_product = {prod_code: group for prod_code, group in whs.groupby('Prod_Code', sort=False)}
+    ordered = jobs.sort_values(['dEnd', 'SO'], kind='mergesort', na_position='last')
+    for prod_code, product_jobs in ordered.groupby('Prod_Code', sort=False):
+        moves = whs_by_product.get(prod_code)
+        if moves is None:
+            continue
+        moves = moves.sort_values('Date', kind='mergesort')
+        dates = list(moves['Date'])
+        remaining = list(moves['Qty'].fillna(0))
+        for idx, dstart, quantity in zip(product_jobs.index, product_jobs['dStart'], product_jobs['Quantity']):
+            need = quantity if pd.notnull(quantity) else 0
+            for i, move_date in enumerate(dates):
+                if need <= 0:
+                    break
+                if remaining[i] <= 0 or (pd.notnull(dstart) and move_date < dstart):
+                    continue
+                take = min(need, remaining[i])
+                remaining[i] -= take
+                need -= take
+                allocated[idx] += take
+    return allocated
+
+def discover_targets(df_job, main_move_df, horizon_days=30, lookback_days=None, today=None):
+    """Open SOs with dEnd up to the horizon, soonest dEnd and largest shortfall first.
+
+    Shortfall is worked out per (SO, Prod_Code), the level export_target
+    reports on: the ordered Quantity less the WHS quantity allocated to it
+    by `allocate_whs`. An SO is open while any of its products still has a
+    shortfall, and is due at the earliest dEnd among those. Overdue SOs are
+    kept unless `lookback_days` is given.
+    """
+    today = pd.Timestamp(today or date.today())
+    jobs = df_job[['SO', 'Prod_Code', 'dStart', 'dEnd', 'Quantity']].copy()
+    jobs = jobs[jobs['SO'].notna()]
+    jobs['dStart'] = pd.to_datetime(jobs['dStart'], errors='coerce')
+    jobs['dEnd'] = pd.to_datetime(jobs['dEnd'], errors='coerce')
+    jobs = (
+        jobs
+        .groupby(['SO', 'Prod_Code'], sort=False)
+        .agg(dStart=('dStart', 'max'), dEnd=('dEnd', 'max'), Quantity=('Quantity', 'sum'))
+        .reset_index()
+    )
+
+    # Allocate over every job, not just those in the horizon, so stock already
+    # delivered against older orders is not credited to current ones
+    whs = main_move_df[main_move_df['Source'] == 'WHS'][['Prod_Code', 'Date', 'Qty']].copy()
+    whs['Date'] = pd.to_datetime(whs['Date'], errors='coerce')
+    whs = whs[whs['Date'].notna()]
+    jobs['Shortfall'] = (jobs['Quantity'].fillna(0) - allocate_whs(jobs, whs)).clip(lower=0)
+
+    in_horizon = jobs['dEnd'].notna() & (jobs['dEnd'] <= today + timedelta(days=horizon_days))
+    if lookback_days is not None:
+        in_horizon &= jobs['dEnd'] >= today - timedelta(days=lookback_days)
+    # Lines already delivered must not pull their SO's due date forward
+    jobs = jobs[in_horizon & (jobs['Shortfall'] > 0)]
+
+    per_so = jobs.groupby('SO').agg(dEnd=('dEnd', 'min'), Shortfall=('Shortfall', 'sum')).reset_index()
+    per_so = per_so.sort_values(['dEnd', 'Shortfall'], ascending=[True, False], kind='mergesort')
+    return list(per_so['SO'])
+
+def within_budget(targets, budget_seconds=None):
+    """Yield targets in order until `budget_seconds` have elapsed."""
+    start = time.monotonic()
+    for i, target in enumerate(targets):
+        if budget_seconds is not None and time.monotonic() - start >= budget_seconds:
+            skipped = targets[i:]
+            print(f"Time budget of {budget_seconds}s used up, skipping {len(skipped)} SO(s): {', '.join(map(str, skipped))}")
+            return
+        yield target
@@ -0,0 +1,62 @@
+import sqlite3
+import sys
+import pandas as pd
+from stage_pivot import stage_col_names
+
+store_cols = ['run_date', 'SO', 'PO', 'dEnd', 'Prod_Code', 'Quantity', 'Lot_Num', 'Mold_start',
+              'Daily_Output'] + stage_col_names + ['Rejects', 'Mold_End']
+
+def open_store(path):
+    conn = sqlite3.connect(path)
+    stage_ddl = ", ".join(f'"{col}" INTEGER' for col in stage_col_names + ['Rejects'])
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS so_pivot ('
+        'run_date TEXT, SO TEXT, PO TEXT, dEnd TEXT, Prod_Code TEXT, Quantity REAL, '
+        'Lot_Num TEXT, Mold_start TEXT, Daily_Output REAL, '
+        f'{stage_ddl}, Mold_End TEXT)'
+    )
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_so_pivot_so_run ON so_pivot (SO, run_date)')
+    conn.commit()
+    return conn
+
+def save_pivot(conn, run_date, so_value, pivot_table, mold_ends):
+    """Append one SO's pivot rows; `mold_ends` maps Prod_Code to the Mold_End used."""
+    df = pivot_table.reset_index()
+    df['run_date'] = run_date
+    df['SO'] = str(so_value)
+    df['Mold_End'] = df['Prod_Code'].map(mold_ends)
+    for col in ['PO', 'dEnd', 'Prod_Code', 'Lot_Num', 'Mold_start', 'Mold_End']:
+        df[col] = df[col].apply(lambda val: str(val) if pd.notnull(val) else None)
+    for col in stage_col_names + ['Rejects']:
+        df[col] = df[col].fillna(0).astype(int)
+    df[store_cols].to_sql('so_pivot', conn, if_exists='append', index=False)
+    conn.commit()
+
+def so_history(conn, so_value, since=None):
+    query = 'SELECT * FROM so_pivot WHERE SO = ?'
+    params = [str(so_value)]
+    if since is not None:
+        query += ' AND run_date >= ?'
+        params.append(str(since))
+    query += ' ORDER BY run_date, PO, Prod_Code, Lot_Num'
+    return pd.read_sql_query(query, conn, params=params)
+
+def so_trend(conn, so_value, since=None):
+    """Stage totals, Rejects and latest Mold_End of one SO for every stored run."""
+    sums = ", ".join(f'SUM("{col}") AS "{col}"' for col in stage_col_names + ['Rejects'])
+    query = f'SELECT run_date, {sums}, MAX(Mold_End) AS Mold_End FROM so_pivot WHERE SO = ?'
+    params = [str(so_value)]
+    if since is not None:
+        query += ' AND run_date >= ?'
+        params.append(str(since))
+    query += ' GROUP BY run_date ORDER BY run_date'
+    return pd.read_sql_query(query, conn, params=params)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python snapshot_store.py <store.db> <SO> [since]")
+        sys.exit(1)
+    conn = open_store(sys.argv[1])
+    since = sys.argv[3] if len(sys.argv) > 3 else None
+    print(so_trend(conn, sys.argv[2], since=since).to_string(index=False))
+    conn.close()
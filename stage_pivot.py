@@ -0,0 +1,36 @@
+import pandas as pd
+
+stage_col_names = ["Mold", "Subcon", "Receive", "Count", "QA", "Pack", "WHS"]
+
+pivot_index = ['PO','dEnd', 'Prod_Code', 'Quantity', 'Lot_Num', 'Mold_start', 'Daily_Output']
+
+def compute_rejects_row(row, stage_cols):
+    mold_value = row['Mold'] if pd.notnull(row['Mold']) else 0
+    last_val = 0
+    for col in stage_cols[1:]:
+        val = row[col] if pd.notnull(row[col]) else 0
+        if val > 0:
+            last_val = val
+    diff = mold_value - last_val
+    return diff if diff > 0 else 0
+
+def pivot_stages(filtered):
+    """Pivot filtered lot movements into one row per lot with stage columns and Rejects."""
+    pivot_table = pd.pivot_table(
+        filtered,
+        index=pivot_index,
+        columns='Source',
+        values='Qty',
+        aggfunc='sum',
+        fill_value=0
+    )
+    desired_order = stage_col_names
+    for col in desired_order:
+        if col not in pivot_table.columns:
+            pivot_table[col] = 0
+    pivot_table = pivot_table[desired_order]
+
+    pivot_table['Rejects'] = pivot_table.apply(
+        lambda row: compute_rejects_row(row, desired_order), axis=1
+    )
+    return pivot_table
@@ -0,0 +1,36 @@
+"""Fixed cases for scheduler.discover_targets. Run with: python -m pytest test_scheduler.py"""
+from datetime import date
+import pandas as pd
+from scheduler import discover_targets
+
+today = date(2025, 3, 1)
+
+df_job = pd.DataFrame([
+    # SO-A orders P on two lines; one WHS run of 1000 covers only half of it
+    ('SO-A', 'P', date(2025, 2, 1), date(2025, 3, 5), 1000),
+    ('SO-A', 'P', date(2025, 2, 1), date(2025, 3, 5), 1000),
+    # Due later, so SO-A gets the P stock first and SO-B stays open
+    ('SO-B', 'P', date(2025, 2, 1), date(2025, 3, 10), 500),
+    # Fully warehoused
+    ('SO-C', 'Q', date(2025, 2, 1), date(2025, 3, 3), 300),
+    # Months overdue and still open: the most urgent, kept without a Lookback
+    ('SO-D', 'R', date(2024, 10, 1), date(2024, 11, 1), 200),
+    # An early line already delivered and a late one still open: due with the open line
+    ('SO-E', 'X', date(2025, 1, 15), date(2025, 2, 10), 400),
+    ('SO-E', 'Y', date(2025, 2, 1), date(2025, 3, 20), 100),
+], columns=['SO', 'Prod_Code', 'dStart', 'dEnd', 'Quantity'])
+
+main_move_df = pd.DataFrame([
+    ('P', date(2025, 2, 20), 1000.0, 'WHS'),
+    ('Q', date(2025, 2, 25), 300.0, 'WHS'),
+    ('X', date(2025, 2, 5), 400.0, 'WHS'),
+], columns=['Prod_Code', 'Date', 'Qty', 'Source'])
+
+def test_shared_product_and_partly_delivered_so():
+    assert discover_targets(df_job, main_move_df, today=today) == ['SO-D', 'SO-A', 'SO-B', 'SO-E']
+
+def test_lookback_drops_long_overdue_sos():
+    assert discover_targets(df_job, main_move_df, lookback_days=60, today=today) == ['SO-A', 'SO-B', 'SO-E']
+
+def test_horizon_drops_later_sos():
+    assert discover_targets(df_job, main_move_df, horizon_days=7, today=today) == ['SO-D', 'SO-A']